@@ -1,10 +1,7 @@
 import clr
 clr.AddReference('RevitAPI')
-clr.AddReference('RevitServices')
-clr.AddReference('RevitNodes')
 clr.AddReference('System')
 
-from RevitServices.Persistence import DocumentManager
 from Autodesk.Revit import DB
 from Autodesk.Revit.DB import Document, BuiltInCategory, Transaction, BuiltInParameterGroup, FamilyParameter, FamilyType, FilteredElementCollector
 from Autodesk.Revit.UI.Selection import Selection, ObjectType
@@ -19,48 +16,65 @@ doc = __revit__.ActiveUIDocument.Document
 # Define the file path for the CSV
 file_path = "B:\\ColorSchemes.csv"
 
-# Open the CSV file for writing
-with open(file_path, mode='w', newline='') as file:
+# View types that can carry a color fill scheme
+color_scheme_view_types = (DB.ViewType.FloorPlan, DB.ViewType.CeilingPlan, DB.ViewType.AreaPlan, DB.ViewType.Section)
+
+# Categories a view can carry a color fill scheme for
+color_scheme_category_ids = [DB.ElementId(category) for category in
+                             (BuiltInCategory.OST_Rooms, BuiltInCategory.OST_Areas, BuiltInCategory.OST_MEPSpaces)]
+
+# Bound once so the inner loop doesn't look up the format string per color
+argb_format = "({0},{1},{2},{3})".format
+
+def entry_value(entry):
+    # A scheme entry holds its value in the getter that matches its storage type
+    storage_type = entry.StorageType
+    if storage_type == DB.StorageType.String:
+        return entry.GetStringValue()
+    if storage_type == DB.StorageType.Double:
+        return entry.GetDoubleValue()
+    if storage_type == DB.StorageType.Integer:
+        return entry.GetIntegerValue()
+    if storage_type == DB.StorageType.ElementId:
+        element = doc.GetElement(entry.GetElementIdValue())
+        return element.Name if element else ""
+    return ""
+
+# Open the CSV file for writing, buffered so rows hit the disk in large blocks
+with open(file_path, mode='wb', buffering=1 << 20) as file:
     writer = csv.writer(file)
 
     # Write headers
-    writer.writerow(["View Name", "Color Scheme Name", "Category Name", "Color Value (ARGB)"])
+    writer.writerow(["View Name", "Color Scheme Name", "Category Name", "Entry Value", "Color Value (ARGB)"])
 
-    # Get all views in the document
-    views_collector = FilteredElementCollector(doc).OfClass(DB.View)
+    # Get the views in the document that can have a color scheme, skipping templates,
+    # schedules, 3D views etc. before making any color scheme calls
+    views_collector = [view for view in FilteredElementCollector(doc).OfClass(DB.View)
+                       if not view.IsTemplate and view.ViewType in color_scheme_view_types]
 
     # Iterate through views to find and export color schemes
     for view in views_collector:
-        # Get color schemes in the view
-        color_schemes = (view.ElementID).GetColorFillSchemeID()
-
-        color_entries = color_schemes.ColorFillScheme.GetEntries
-
-        for color_scheme in color_entries:
-            # Get the name of the color scheme entry
+        view_name = view.Name
+        for category_id in color_scheme_category_ids:
+            # Get the color scheme the view applies to this category, if any
+            scheme_id = view.GetColorFillSchemeId(category_id)
+            if scheme_id == DB.ElementId.InvalidElementId:
+                continue
+            color_scheme = doc.GetElement(scheme_id)
             scheme_name = color_scheme.Name
 
-
-# 
-
-
             # Get the category associated with the color scheme
-            category_id = color_scheme.CategoryId
-            category = doc.GetElement(category_id)
+            category = DB.Category.GetCategory(doc, color_scheme.CategoryId)
             category_name = category.Name if category else "Unknown Category"
 
-            # Get color definitions
-            definitions = color_scheme.ColorFillScheme.GetEntries
-
-            for definition in definitions:
-                # Extract color and value information
-                color = definition.Color
-                value = definition.Value
+            # Materialize the entries once, then write one row per entry
+            for entry in list(color_scheme.GetEntries()):
+                color = entry.Color
 
                 # Convert color to ARGB
-                argb_value = "({0},{1},{2},{3})".format(color.Alpha, color.Red, color.Green, color.Blue)
+                argb_value = argb_format(color.Alpha, color.Red, color.Green, color.Blue)
 
                 # Write data to CSV
-                writer.writerow([view.Name, scheme_name, category_name, argb_value])
+                writer.writerow([view_name, scheme_name, category_name, entry_value(entry), argb_value])
 
 print("Color schemes exported to " + file_path)
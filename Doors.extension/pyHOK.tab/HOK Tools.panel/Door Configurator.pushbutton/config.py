@@ -16,40 +16,37 @@ FRAME_TYPE_GUID = "b6930f0e-c0f5-432b-80ee-6c649f876cae"
 # Purge GUID
 PURGE_GUID = 'e8c63650-70b7-435a-9010-ec97660c1bda'
 
-# Frame to primitive mapping
-# Frame to primitive mapping with family name suffix
-FRAME_TO_PRIMITIVE_MAPPING = {
-    "S01": ("DoorConfigPrimative02", "_SingleSwing_HOK_I"),
-    "S02": ("DoorConfigPrimative02", "_SingleSwing_HOK_I"),
-    "S03": ("DoorConfigPrimative02", "_SingleSwing_HOK_I"),
-    "D01A": ("DoorConfigPrimative02", "_SingleSwing_HOK_I"),
-    "D01B": ("DoorConfigPrimative02", "_SingleSwing_HOK_I"),
-    "D01C": ("DoorConfigPrimative02", "_SingleSwing_HOK_I"),
-    "D03A": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D03B": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D03C": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D04A": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D04B": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D04C": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D05A": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D05B": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D05C": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D06A": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D06B": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D06C": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D07A": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D07B": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D07C": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D08A": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D08B": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D08C": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "S21": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "S22": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "DS1": ("DoorConfigPrimativeSingleSliding02", "_SingleSliding_HOK_I"),
-    "S23": ("DoorConfigPrimativeSidelite01", "_SingleSwing_HOK_I"),
-    "D02": ("DoorConfigPrimativeDouble01", "_DoubleSwing_HOK_I"),
-    "DCM1": ("DoorConfigPrimativeDoubleEgress", "_DoubleEgress_HOK_I"),
-    "DCM2": ("DoorConfigPrimativeDouble01", "_DoubleSwing_HOK_I"),
+# Number of families loaded, or types edited, per project transaction in batch mode
+TRANSACTION_BATCH_SIZE = 50
+
+# Frame types grouped by the source family primitive they start from
+PRIMITIVE_TO_FRAMES = {
+    "DoorConfigPrimative02": ("S01", "S02", "S03", "D01A", "D01B", "D01C"),
+    "DoorConfigPrimativeSidelite01": (
+        "D03A", "D03B", "D03C", "D04A", "D04B", "D04C",
+        "D05A", "D05B", "D05C", "D06A", "D06B", "D06C",
+        "D07A", "D07B", "D07C", "D08A", "D08B", "D08C",
+        "S21", "S22", "S23",
+    ),
+    "DoorConfigPrimativeSingleSliding02": ("DS1",),
+    "DoorConfigPrimativeDouble01": ("D02", "DCM2"),
+    "DoorConfigPrimativeDoubleEgress": ("DCM1",),
+}
+
+# Frame to primitive mapping, flattened from the groups above
+FRAME_TO_PRIMITIVE = dict(
+    (frame, primitive)
+    for primitive, frames in PRIMITIVE_TO_FRAMES.items()
+    for frame in frames
+)
+
+# Family name suffix for each primitive
+PRIMITIVE_TO_SUFFIX = {
+    "DoorConfigPrimative02": "_SingleSwing_HOK_I",
+    "DoorConfigPrimativeSidelite01": "_SingleSwing_HOK_I",
+    "DoorConfigPrimativeSingleSliding02": "_SingleSliding_HOK_I",
+    "DoorConfigPrimativeDouble01": "_DoubleSwing_HOK_I",
+    "DoorConfigPrimativeDoubleEgress": "_DoubleEgress_HOK_I",
 }
 
 
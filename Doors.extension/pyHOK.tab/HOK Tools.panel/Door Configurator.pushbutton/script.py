@@ -4,15 +4,19 @@
 from Autodesk.Revit import DB, UI
 from Autodesk.Revit.DB import Document, BuiltInCategory, Transaction, BuiltInParameterGroup, FamilyParameter, FamilyType, FilteredElementCollector
 from Autodesk.Revit.UI.Selection import Selection, ObjectType
+from Autodesk.Revit.Exceptions import ArgumentException
 from pyrevit import forms, revit, coreutils, script
 from pyrevit.forms import WPFWindow
 import tempfile
 import os
+import shutil
+import threading
 import clr
 import System
 import sys
 from System.Collections.Generic import List
 import csv
+from collections import OrderedDict
 # Import settings from config.py
 import config
 
@@ -20,6 +24,36 @@ import config
 doc = __revit__.ActiveUIDocument.Document
 ui = __revit__.ActiveUIDocument
 logger = coreutils.logger.get_logger(__name__)
+# name -> Family lookup for doc, filled by get_family_by_name and kept current by on_document_changed
+_family_cache = None
+# family id -> name for the families in _family_cache, so renames and deletes re-key without scanning it
+_family_names = {}
+# temp folder shared by every family saved in this run, see get_temp_dir
+_temp_dir = None
+# primitive name -> prototype door Family, filled by find_door_primitive
+_primitive_cache = {}
+# family id -> {type name: symbol id}, filled by family_symbol_ids
+_symbol_cache = {}
+# (family id, parameter id) -> {nested family name: type id}, filled by nested_type_ids
+_nested_type_cache = {}
+# Shared parameter GUIDs parsed once for get_Parameter lookups
+PW_GUID = System.Guid(config.PANEL_WIDTH_GUID) #PANEL WIDTH PANEL 1
+PH_GUID = System.Guid(config.PANEL_HEIGHT_GUID) #PANEL HEIGHT
+PN_GUID = System.Guid(config.PANEL_TYPE_GUID) #PANEL 1
+PF_GUID = System.Guid(config.FRAME_TYPE_GUID) #FRAME
+# Collector filters that never change, built once and reused by every lookup
+FAMILY_NAME_PARAM_ID = DB.ElementId(DB.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM)
+DOORS_FILTER = DB.ElementCategoryFilter(BuiltInCategory.OST_Doors)
+FAMILY_SYMBOL_FILTER = DB.ElementClassFilter(DB.FamilySymbol)
+FAMILY_CLASS_FILTER = DB.ElementClassFilter(DB.Family)
+# The Performance Adviser's purge rule never changes during a session, so find it once
+PURGE_GUID = System.Guid(config.PURGE_GUID)
+PERFORMANCE_ADVISER = DB.PerformanceAdviser.GetPerformanceAdviser()
+PURGE_RULE_IDS = List[DB.PerformanceAdviserRuleId]([rule for rule in PERFORMANCE_ADVISER.GetAllRuleIds() if rule.Guid == PURGE_GUID])
+# One set of save options for every family; the temp copy is overwritten and needs only one backup
+SAVE_AS_OPTS = DB.SaveAsOptions()
+SAVE_AS_OPTS.OverwriteExistingFile = True
+SAVE_AS_OPTS.MaximumBackups = 1
 
 
 def main():
@@ -27,6 +61,7 @@ def main():
     xaml_file_path = config.XAML_FILE_PATH
     csv_file_path = config.CSV_FILE_PATH
     selected_action = prompt_door_action()
+    finished = None
     if selected_action == 'New Door':
     # Prompt user to enter types in form
         class UserDetailsForm(WPFWindow):
@@ -48,21 +83,34 @@ def main():
         frame_type = form.frame_type.upper()
         width = form.width.upper()
         height = form.height.upper()
-        print(panel_type, frame_type, width, height)
+        logger.debug("{} {} {} {}".format(panel_type, frame_type, width, height))
 #format of family name
         doorD, suffix = settings(frame_type)
-        family_name = str.format(("08-Door_") + panel_type + ("_") + frame_type + suffix)
+        if not doorD:
+            return
+        family_name = "08-Door_" + panel_type + "_" + frame_type + suffix
 # Convert width and height to Revit internal units (feet)
         width = float(width) / 12.0
         height = float(height) / 12.0
 # check to see if the info enters matches an existing door in the project. 
 # #If yes, then check type, and if a new type, go to the edit function
         if check_fam(family_name, doc):
-           # edit_types_and_params(family_name, panel_type, frame_type, width, height)  # Call function to edit an existing door
-           print("edit_existing_door()")
+# the family is already loaded, so duplicating a type skips the EditFamily/SaveAs/LoadFamily round-trip
+            try:
+                done = edit_types_and_params(family_name, panel_type, frame_type, width, height)
+            except Exception as e:
+                logger.error("Failed to add type to " + family_name + ": {}".format(e))
+                return
         else:
 # if new, use save_as_new_family
-            save_as_new_family(family_name, panel_type, frame_type, width, height)
+            try:
+                family_path = save_as_new_family(family_name, doorD, panel_type, frame_type, [(width, height)])
+            except Exception as e:
+                logger.error("Failed to build " + family_name + ": {}".format(e))
+                return
+            done = load_families([family_path])
+        if done:
+            finished = family_name
 #if edit, use edit_types_and_parameters
     elif selected_action == 'Edit Existing Door':
         print("edit_existing_door()")
@@ -70,56 +118,163 @@ def main():
     elif selected_action == 'Batch Add Door Families and Types':
 # Load door configurations from the CSV file
         door_configs = load_door_configs_from_csv(csv_file_path)
-# Now you can iterate over door_configs as before
+        family_paths = []
+        type_edits = []
+        skipped_rows = 0
+# Group the rows by panel and frame (i.e. by family) so each new family is built with one EditFamily/SaveAs/LoadFamily for all of its sizes
+        door_families = OrderedDict()
         for confi in door_configs:
-        # Unpack the configuration tuple into variables
+        # Unpack the configuration tuple into variables; sizes are already in feet
             panel_type, frame_type, width, height = confi
-                #format of family name
-            doorD, suffix = settings(frame_type)
-            family_name = "08-Door_" + panel_type + "_" + frame_type + suffix
-# Convert width and height to Revit internal units (feet)
-            width = float(width) / 12.0
-            height = float(height) / 12.0
-# Call save_as_new_family with the unpacked parameters
-            save_as_new_family(family_name, panel_type, frame_type, width, height)
-            print("Processed " + family_name + " with panel " + panel_type + ", frame " + frame_type + ", width " + str(width) + ", height " + str(height) + ".")
+            door_families.setdefault((panel_type, frame_type), []).append((width, height))
+# Now you can iterate over the families, with a progress bar so Revit keeps repainting during the batch
+        with forms.ProgressBar(title='Building door families and types...', step=1) as pb:
+            for count, ((panel_type, frame_type), sizes) in enumerate(door_families.items()):
+                pb.update_progress(count + 1, len(door_families))
+#format of family name, resolved once per family rather than per row
+                doorD, suffix = settings(frame_type)
+                if not doorD:
+                    logger.warning("Skipping " + str(len(sizes)) + " row(s) for panel " + panel_type + ", frame " + frame_type + ": " + ", ".join(type_name(width, height) for width, height in sizes))
+                    skipped_rows += len(sizes)
+                    continue
+                family_name = "08-Door_" + panel_type + "_" + frame_type + suffix
+# Existing families only need new types, applied after loading; new ones go through save_as_new_family
+                if check_fam(family_name, doc):
+                    for width, height in sizes:
+                        type_edits.append((family_name, panel_type, frame_type, width, height))
+                else:
+# one family failing to build shouldn't lose the ones already built, which are only loaded after the loop
+                    try:
+                        family_paths.append(save_as_new_family(family_name, doorD, panel_type, frame_type, sizes))
+                    except Exception as e:
+                        logger.error("Failed to build " + family_name + ": {}".format(e))
+                        continue
+                logger.debug("Processed " + family_name + " with panel " + panel_type + ", frame " + frame_type + ", " + str(len(sizes)) + " size(s).")
+# Load the new families and add the new types inside one transaction group, so the batch is a single undo entry
+        with DB.TransactionGroup(doc, 'Batch Add Door Families and Types') as group:
+            group.Start()
+            loaded = load_families(family_paths)
+            edited = edit_types_batch(type_edits)
+            group.Assimilate()
+# report what actually made it into the project, not what was attempted
+        finished = "{} of {} new families and {} of {} types in existing families ({} rows skipped for unknown frame types)".format(loaded, len(family_paths), edited, len(type_edits), skipped_rows)
     else:
         print("No action selected or action canceled.")
-#Print success message
-    print("HOK Door Configurator finished {} at {} on {}".format(family_name, coreutils.current_time(), coreutils.current_date()))
+#Print one success message for the whole run
+    if finished:
+        print("HOK Door Configurator finished {} at {} on {}".format(finished, coreutils.current_time(), coreutils.current_date()))
 
 #function to read batch door types from external csv file
 def load_door_configs_from_csv(csv_file_path):
-    door_configs = []
+    # Yield rows as they are read instead of building the whole list first
     with open(csv_file_path, mode='r') as file:
         reader = csv.reader(file)
         for row in reader:
-            if row:  # Ensure the row is not empty
-                # Convert width and height to integers before appending
-                door_configs.append((row[0], row[1], int(row[2]), int(row[3])))
-    return door_configs
+            if len(row) < 4:  # Skip empty or short rows
+                continue
+            # Convert width and height from inches to Revit internal units (feet)
+            yield (row[0], row[1], float(row[2]) / 12.0, float(row[3]) / 12.0)
 
 #function for mapping frame types to starting primitive family
 def settings(frame_name):
     # Point to dictionary in config file where the keys are frame types and the values are source family primitives
     # Attempt to get the source family primitive for the given frame name
-    # Unpack the tuple into doorD and suffix
-    mapping = config.FRAME_TO_PRIMITIVE_MAPPING.get(frame_name, (None, None))
-    doorD, suffix = mapping
+    # The family name suffix is shared per primitive, so it lives in its own smaller map
+    doorD = config.FRAME_TO_PRIMITIVE.get(frame_name)
     if doorD:
-        print("The source family primitive for " + frame_name + " is " + doorD + ".")
+        suffix = config.PRIMITIVE_TO_SUFFIX[doorD]
+        logger.debug("The source family primitive for " + frame_name + " is " + doorD + ".")
         # Now return both the doorD and the suffix
         return doorD, suffix
     else:
-        print("No action selected or action canceled.")
+        logger.warning("No source family primitive is mapped to frame type " + frame_name + ".")
         return None, None
     
+def type_name(width, height):
+    # Type names are the size in whole inches; round so feet->inches float error can't drop an inch
+    return "%dx%d" % (round(width*12), round(height*12))
+
+def get_family_by_name(doc, family_name):
+    # Index the project's families by name once, then reuse it for every lookup
+    global _family_cache
+    if _family_cache is None:
+        _family_cache = {}
+        for family in FilteredElementCollector(doc).WherePasses(FAMILY_CLASS_FILTER):
+            name = family.Name
+            _family_cache[name] = family
+            _family_names[family.Id.IntegerValue] = name
+    return _family_cache.get(family_name)
+
+def family_symbol_ids(family):
+    # Index a family's types by name once so repeat edits don't rescan GetFamilySymbolIds
+    key = family.Id.IntegerValue
+    symbol_ids = _symbol_cache.get(key)
+    if symbol_ids is None:
+        symbol_ids = {}
+        get_element = doc.GetElement
+        get_name = DB.Element.Name.__get__
+        for symbol_id in family.GetFamilySymbolIds():
+            symbol_ids[get_name(get_element(symbol_id))] = symbol_id
+        _symbol_cache[key] = symbol_ids
+    return symbol_ids
+
+def nested_type_ids(family, parameter):
+    # Resolve the nested types a family type parameter can take once per family, keyed by nested family name
+    key = (family.Id.IntegerValue, parameter.Id.IntegerValue)
+    type_ids = _nested_type_cache.get(key)
+    if type_ids is None:
+        type_ids = {}
+        get_element = doc.GetElement
+        for type_id in family.GetFamilyTypeParameterValues(parameter.Id):
+            type_ids.setdefault(get_element(type_id).FamilyName, type_id)
+        _nested_type_cache[key] = type_ids
+    return type_ids
+
+def on_document_changed(sender, args):
+    # Apply added/deleted/renamed families to _family_cache instead of throwing it away and rescanning
+    if _family_cache is None or not args.GetDocument().Equals(doc):
+        return
+    for element_id in args.GetDeletedElementIds():
+        name = _family_names.pop(element_id.IntegerValue, None)
+        if name is not None:
+            _family_cache.pop(name, None)
+    # let Revit pick out the families, so the thousands of other ids a LoadFamily touches never reach Python
+    get_element = doc.GetElement
+    changed_ids = list(args.GetAddedElementIds(FAMILY_CLASS_FILTER)) + list(args.GetModifiedElementIds(FAMILY_CLASS_FILTER))
+    for element_id in changed_ids:
+        family = get_element(element_id)
+        name = family.Name
+        # drop the old name first in case the family was renamed
+        old_name = _family_names.get(element_id.IntegerValue)
+        if old_name is not None and old_name != name:
+            _family_cache.pop(old_name, None)
+        _family_names[element_id.IntegerValue] = name
+        _family_cache[name] = family
+
 def check_fam(family_name, doc):
-    collector = FilteredElementCollector(doc).OfClass(DB.Family)
-    for family in collector:
-        if family.Name == family_name:
-            return True  # Family exists
-    return False  # Family does not exist
+    return get_family_by_name(doc, family_name) is not None
+
+def family_name_filter(family_name):
+    # Let Revit match the family name natively instead of walking every type in Python
+    rule = DB.ParameterFilterRuleFactory.CreateEqualsRule(FAMILY_NAME_PARAM_ID, family_name)
+    return DB.ElementParameterFilter(rule)
+
+def find_nested_family(family_doc, family_name):
+    # FirstElement stops the collector at the first matching symbol
+    symbol = DB.FilteredElementCollector(family_doc)\
+                .WherePasses(FAMILY_SYMBOL_FILTER).WherePasses(family_name_filter(family_name)).FirstElement()
+    if symbol:
+        return symbol.Family
+    return None
+
+def find_door_primitive(family_name):
+    # Batches reuse the same few primitives, so only query Revit the first time each is asked for
+    if family_name not in _primitive_cache:
+        symbol = DB.FilteredElementCollector(doc)\
+                    .WherePasses(FAMILY_SYMBOL_FILTER).WherePasses(DOORS_FILTER)\
+                    .WherePasses(family_name_filter(family_name)).FirstElement()
+        _primitive_cache[family_name] = symbol.Family if symbol else None
+    return _primitive_cache[family_name]
 
 def prompt_door_action():
     # Define the options to present to the user
@@ -129,36 +284,29 @@ def prompt_door_action():
     # Return the selected option
     return selected_option
 
-# Function to save door as new family
-def save_as_new_family(family_name, panel_type, frame_type, width, height):
+# Function to save door as new family, with one type per (width, height) in sizes
+def save_as_new_family(family_name, doorD, panel_type, frame_type, sizes):
 # Save the family with a new name
-    temp_dir = tempfile.mkdtemp()
-    family_path = os.path.join(temp_dir, family_name + ".rfa")
-    backupf_path = os.path.join(temp_dir,"Backup")
+    family_path = os.path.join(get_temp_dir(), family_name + ".rfa")
     final_path = os.path.join(config.FINAL_FAMILY_PATH, family_name + ".rfa")
+# never replace a library family, which may be in use by other projects; fail before doing any work
+    if os.path.exists(final_path):
+        raise IOError(final_path + " already exists in the family library")
 ##This part below chooses whioch primitive door family to start from based on user frame type
-#run dictionary function to pull base family name
-    doorD, suffix = settings(frame_type)
-    if doorD:       
-        filCol = DB.FilteredElementCollector(doc)\
-                    .OfCategory(BuiltInCategory.OST_Doors).WhereElementIsElementType()
-# Iterate through the elements to find the one with the matching name
-        for el in filCol:
-            elFam = el.Family
-           # print(elFam.Name)
-            if elFam.Name == doorD:
-                door = elFam
-                break
-    else: exit            
-    print("making a new family...")
-    print (str(family_name))
+#doorD is the base family name the caller already resolved with settings()
+    door = find_door_primitive(doorD)
+    logger.debug("making a new family... " + family_name)
 # Edit Family to bring up the family editor
     family_temp = (doc.EditFamily(door))#EditFamily must be called OUTSIDE of a transaction
-#make new type and assign values
-    typeName = "{}x{}".format(int(width*12), int(height*12))
-    BamId = None
-    FamId = None                
-    FlamId = None
+    try:
+        build_family_types(family_temp, family_path, final_path, panel_type, frame_type, sizes)
+    finally:
+#close the edited family so batch runs don't pile up open family documents, even if building it failed
+        family_temp.Close(False)
+#return the temp path so the caller can load it with the rest of the batch
+    return family_path
+
+def build_family_types(family_temp, family_path, final_path, panel_type, frame_type, sizes):
 #start a transaction and instantiate family manager
     with Transaction(family_temp, 'Make Type and set Values') as trans:
         try:
@@ -166,145 +314,217 @@ def save_as_new_family(family_name, panel_type, frame_type, width, height):
             famMan = family_temp.FamilyManager
             famFamily = family_temp.OwnerFamily
             deleteType = famMan.CurrentType
-            typeMake = famMan.NewType(typeName)
-            print("making new type...")       
-#these are the shared parameter GUIDs for the parameters we're looking for
-            pwGU = config.PANEL_WIDTH_GUID #PANEL WIDTH PANEL 1
-            phGU = config.PANEL_HEIGHT_GUID#PANEL HEIGHT
-            pnGU = config.PANEL_TYPE_GUID #PANEL 1
-            pfGU = config.FRAME_TYPE_GUID #FRAME
+            typeMake = None
  #filtered element collector to grab nested door frame and panels
-            print("updating parameters...")
-            nestFams = DB.FilteredElementCollector(family_temp)\
-                .OfClass(DB.Family).ToElements()
-            for FamThis in nestFams:
-                #print("type:{}".format(FamThis.Name))
-                if FamThis.Name == panel_type:
-                    BamId = FamThis
-                elif FamThis.Name == frame_type:
-                    FamId = FamThis
-                else: 
-                    FlamId = FamThis
+            logger.debug("updating parameters...")
+            BamId = find_nested_family(family_temp, panel_type)
+            FamId = find_nested_family(family_temp, frame_type)
+#pick each nested symbol once, before the parameter loop; setting every symbol in turn only kept the last one
+            BamSym = next(iter(BamId.GetFamilySymbolIds()), None) if BamId else None
+            FamSym = next(iter(FamId.GetFamilySymbolIds()), None) if FamId else None
+#a misspelt panel or frame code would otherwise save a family named for it but holding the prototype's defaults
+            if BamSym is None:
+                raise ValueError("no nested panel family named " + panel_type)
+            if FamSym is None:
+                raise ValueError("no nested frame family named " + frame_type)
+#index the shared Family parameters by GUID in one pass, then set the 4 we want with direct lookups
+            famSet = famMan.Set
+            shared_params = dict((parr.GUID, parr) for parr in famMan.GetParameters() if parr.IsShared)
+            missing = [str(guid) for guid in (PW_GUID, PH_GUID, PN_GUID, PF_GUID) if guid not in shared_params]
+            if missing:
+                raise ValueError("prototype is missing shared parameter(s) " + ", ".join(missing))
+#make a new type for each size and assign values, skipping repeated sizes
+            made_types = {}
+            for width, height in sizes:
+                typeName = type_name(width, height)
+# names are rounded to the inch, so two different sizes can share one; only the first is built
+                if typeName in made_types:
+                    logger.warning("Skipping {}x{}in for {}: type {} was already made from {}x{}in".format(
+                        width*12, height*12, os.path.basename(family_path), typeName, made_types[typeName][0]*12, made_types[typeName][1]*12))
+                    continue
+                made_types[typeName] = (width, height)
+                typeMake = famMan.NewType(typeName)
+                logger.debug("making new type " + typeName + "...")
+                param_values = {PW_GUID: width, PH_GUID: height, PN_GUID: BamSym, PF_GUID: FamSym}
+                for guid, value in param_values.items():
+                    famSet(shared_params[guid], value)
 #If a new type was made successfully
             if typeMake:
-#get the set of Family parameters and iterate through them
-                paraSet = famMan.GetParameters()
-            #for each parameter in the family
-                for parr in paraSet:
-                #if the parameter is shared,
-                    if parr.IsShared:
-                        pParr = parr.GUID
-                    #print ( pParr)
-  #check if the parameter GUID matches the 4 parameters we are looking to set                
-                        if str(pParr) == pwGU:
-                    #if PANEL WIDTH PANEL 
-                            famMan.Set(parr, width)
-                        elif str(pParr) == phGU:
-                    #elif PANEL HEIGHT   
-                            famMan.Set(parr, height)
-                        elif str(pParr) == pnGU:
-                    #elif panel type
-                            BamSyms = BamId.GetFamilySymbolIds()
-                            for BamSym in BamSyms:
-                                famMan.Set(parr, BamSym)  
-                    #elif frame types                  
-                        elif str(pParr) == pfGU:
-                            FamSyms = FamId.GetFamilySymbolIds()
-                            for FamSym in FamSyms:
-                                famMan.Set(parr, (FamSym)) 
         #set delete type as current type
                 famMan.CurrentType = deleteType
                 typeDel = famMan.DeleteCurrentType()
                 famMan.CurrentType = typeMake  
-                print("deleting embrionic type...")  
+                logger.debug("deleting embrionic type...")
                 trans.Commit()
-        except Exception as e: 
-            print("Error: {}".format(e))
+        except Exception:
             trans.RollBack()
-#save as the family with new name and path
-    family_temp.SaveAs(family_path, DB.SaveAsOptions())
-    print("saving new file...")
-#purge unused nested families function
+# don't save, copy or load a family whose types weren't set up; the caller reports it
+            raise
+#purge unused nested families function, before the one SaveAs so both copies are purged
     purge_perf_adv(family_temp)
-# Load the saved family back into the project
-    family_temp.SaveAs(final_path, DB.SaveAsOptions())
-    print("loading new family into project...")
-    with Transaction(doc, 'Load Family') as trans:
-        trans.Start()
-        family_loaded= doc.LoadFamily(family_path)
-        if not family_loaded:
-            print("Failed to load family.")
-            return
-        trans.Commit()
-    print ("reticulating splines...")
-    # Clean up the temporary directory
-    os.remove(family_path)
-    os.rmdir(backupf_path)
-    os.rmdir(temp_dir)
+#save as the family with new name and path
+    family_temp.SaveAs(family_path, SAVE_AS_OPTS)
+    logger.debug("saving new file...")
+#copy the saved file to the family library rather than serializing the family a second time
+    shutil.copyfile(family_path, final_path)
+
+def load_families(family_paths):
+# Load the saved families back into the project
+    logger.debug("loading new family into project...")
+    loaded = run_batched('Load Family', family_paths, doc.LoadFamily, lambda family_path: "load family " + family_path)
+    logger.debug("reticulating splines...")
+    return loaded
+
+def run_batched(transaction_name, items, action, describe):
+# Run action(item) for each item, committing one project transaction every TRANSACTION_BATCH_SIZE items
+# with a sub-transaction per item, so one bad item rolls back only itself. Returns how many succeeded.
+    batch_size = config.TRANSACTION_BATCH_SIZE
+    succeeded = 0
+    for start in range(0, len(items), batch_size):
+        with Transaction(doc, transaction_name) as trans:
+            trans.Start()
+            for item in items[start:start + batch_size]:
+                sub = DB.SubTransaction(doc)
+                sub.Start()
+                try:
+                    done = action(item)
+                except Exception as e:
+                    sub.RollBack()
+                    logger.warning("Failed to " + describe(item) + ": {}".format(e))
+                    continue
+                if done:
+                    sub.Commit()
+                    succeeded += 1
+                else:
+                    sub.RollBack()
+                    logger.warning("Failed to " + describe(item) + ".")
+            trans.Commit()
+    return succeeded
+
+def get_temp_dir():
+    # One temp folder per run instead of a mkdtemp/rmdir pair for every family
+    global _temp_dir
+    if _temp_dir is None:
+        _temp_dir = tempfile.mkdtemp(prefix='doorcfg_')
+    return _temp_dir
+
+def cleanup_temp_dir():
+    # rmtree also clears the Backup folder Revit writes next to each SaveAs.
+    # No Revit API is involved, so it runs on a background thread and the UI returns straight away.
+    global _temp_dir
+    if _temp_dir is not None:
+        cleaner = threading.Thread(target=shutil.rmtree, args=(_temp_dir, True))
+        cleaner.daemon = True
+        cleaner.start()
+        _temp_dir = None
 
 def edit_types_and_params(family_name, panel_type, frame_type, width, height):
-#THIS DOESN'T WORK YET, DON'T CALL IT
+#fast path for families already in the project: duplicate a type instead of editing the family
 # open a transaction to make changes to things in Revit
     with Transaction(doc, 'Edit Types and Parameters') as trans:
         trans.Start()
-# Use a FilteredElementCollector to search for elements of the given type
-        collector = DB.FilteredElementCollector(doc)\
-                    .OfClass(DB.Family)
-# Iterate through the elements to find the one with the matching name
-        for elem in collector:
-            if elem.Name == family_name:
-                # Get all family symbols (types) within the loaded family
-                family_symbols = elem.GetFamilySymbolIds()
-                for symbol_id in family_symbols:
-                    symbol = doc.GetElement(symbol_id)
-                    #duplicate the first symbol for simplicity
-                    #specify which to duplicate
-                    new_symbol_id = symbol.Duplicate("{}x{}".format(int(width*12), int(height*12)))
-                    new_sym_ref = DB.Reference(new_symbol_id)
-                    new_symbol = doc.GetElement(new_sym_ref)
-
-                    # Set the new symbol's parameters as needed
-                    new_symbol.LookupParameter(config.PARAMETER_NAMES["panel_width"]).Set(width)
-                    new_symbol.LookupParameter(config.PARAMETER_NAMES["panel_height"]).Set(height)
-                    # Rename the family symbol to reflect the new dimensions in inches
-                    new_symbol.Name = "{}x{}".format(int(width*12), int(height*12))
-                    break  # Exit after processing the first symbol
-                break  # Exit after finding the family
+        edited = apply_type_edit((family_name, panel_type, frame_type, width, height))
         trans.Commit()
+    return edited
+
+def edit_types_batch(type_edits):
+# Apply the batch's type edits through run_batched, one sub-transaction per edit
+    return run_batched('Edit Types and Parameters', type_edits, apply_type_edit, lambda type_edit: "add type to " + type_edit[0])
+
+def apply_type_edit(type_edit):
+    try:
+        return set_type_params(*type_edit)
+    except Exception:
+# the edit is about to be rolled back, and its Duplicate may already be in the type index
+        _symbol_cache.clear()
+        raise
+
+def set_type_params(family_name, panel_type, frame_type, width, height):
+# Add or update one type of a loaded family; the caller owns the transaction
+# Look up the loaded family by name
+    elem = get_family_by_name(doc, family_name)
+    if elem:
+        typeName = type_name(width, height)
+        symbol_ids = family_symbol_ids(elem)
+        existing = typeName in symbol_ids
+        if existing:
+            # the type already exists, so just bring its nested panel/frame up to date
+            new_symbol = doc.GetElement(symbol_ids[typeName])
+        else:
+            # Take the first family symbol (type) directly rather than looping to a break
+            symbol = doc.GetElement(next(iter(elem.GetFamilySymbolIds())))
+            #duplicate the first symbol for simplicity; Duplicate hands back the new type itself
+            new_symbol = symbol.Duplicate(typeName)
+            symbol_ids[typeName] = new_symbol.Id
+
+        # Set the new symbol's parameters as needed
+        # Shared parameters resolve directly by GUID instead of a name scan
+        width_param = new_symbol.get_Parameter(PW_GUID)
+        height_param = new_symbol.get_Parameter(PH_GUID)
+        panel_param = new_symbol.get_Parameter(PN_GUID)
+        frame_param = new_symbol.get_Parameter(PF_GUID)
+        if not (width_param and height_param and panel_param and frame_param):
+            raise ValueError(family_name + " is missing one of its shared door parameters")
+        # a differently sized request that rounds to an existing type's name must not resize that type's placed doors
+        if existing and (abs(width_param.AsDouble() - width) > 1e-6 or abs(height_param.AsDouble() - height) > 1e-6):
+            raise ValueError("type {} of {} is {}x{}in, not resizing it to {}x{}in".format(
+                typeName, family_name, width_param.AsDouble()*12, height_param.AsDouble()*12, width*12, height*12))
+        # Resolve the nested panel and frame, matched by name through the cached lookup;
+        # like the build path, an unknown code is an error rather than keeping the duplicated type's panel/frame
+        panel_id = nested_type_ids(elem, panel_param).get(panel_type)
+        if not panel_id:
+            raise ValueError("no nested panel family named " + panel_type + " in " + family_name)
+        frame_id = nested_type_ids(elem, frame_param).get(frame_type)
+        if not frame_id:
+            raise ValueError("no nested frame family named " + frame_type + " in " + family_name)
+        width_param.Set(width)
+        height_param.Set(height)
+        panel_param.Set(panel_id)
+        frame_param.Set(frame_id)
+        return True
+    return False
 
 def purge_perf_adv(family_doc):
-    purgeGuid = config.PURGE_GUID
-    purgableElementIds = []
-    performanceAdviser = DB.PerformanceAdviser.GetPerformanceAdviser()
-    guid = System.Guid(purgeGuid)
-    ruleId = None
-    allRuleIds = performanceAdviser.GetAllRuleIds()
-    for rule in allRuleIds:
-    # Finds the PerformanceAdviserRuleId for the purge command
-        if str(rule.Guid) == purgeGuid:
-            ruleId = rule
-    ruleIds = List[DB.PerformanceAdviserRuleId]([ruleId])
-    for i in range(4):
-    # Executes the purge
-        failureMessages = performanceAdviser.ExecuteRules(family_doc, ruleIds)
-        if failureMessages.Count > 0:
-        # Retreives the elements
-            purgableElementIds = failureMessages[0].GetFailingElements()
-# Deletes the elements
-    print("it's purgin' time...")
+    logger.debug("it's purgin' time...")
+    getElement = family_doc.GetElement
+    previousIds = set()
     with Transaction(family_doc, 'Its purgin time') as s:
         s.Start()
-        try:
-            family_doc.Delete(purgableElementIds)
-            #print("purge attempt 1")
-        except:
-            for e in purgableElementIds:
-                try:
-                    family_doc.Delete(e)
-                        #print("purge attempt 2")
-                except:
-                        #print("no purge")
-                    pass
+# Deleting unused nested families can leave more unused types behind, so re-run the rule after each delete
+# and stop as soon as a pass finds nothing new (at most 4 passes)
+        for i in range(4):
+        # Executes the purge
+            failureMessages = PERFORMANCE_ADVISER.ExecuteRules(family_doc, PURGE_RULE_IDS)
+            if failureMessages.Count == 0:
+                break
+        # Retreives the elements, dropping ids that no longer resolve
+            purgableElementIds = [e for e in failureMessages[0].GetFailingElements() if getElement(e) is not None]
+            foundIds = set(e.IntegerValue for e in purgableElementIds)
+            if not foundIds or foundIds == previousIds:
+                break
+            previousIds = foundIds
+# Deletes the elements in one Delete(ICollection) call
+            delete_ids(family_doc, List[DB.ElementId](purgableElementIds))
         s.Commit()        
-# Call the main function
-main()
+
+def delete_ids(family_doc, element_ids):
+    # One Delete call for the whole set; if Revit rejects it, split in half to isolate the bad ids
+    if element_ids.Count == 0:
+        return
+    try:
+        family_doc.Delete(element_ids)
+    except ArgumentException:
+        if element_ids.Count == 1:
+            return
+        half = element_ids.Count // 2
+        delete_ids(family_doc, element_ids.GetRange(0, half))
+        delete_ids(family_doc, element_ids.GetRange(half, element_ids.Count - half))
+# Call the main function once, only when run as the button script
+if __name__ == '__main__':
+    doc.Application.DocumentChanged += on_document_changed
+    try:
+        main()
+    finally:
+        doc.Application.DocumentChanged -= on_document_changed
+# Remove the run's temp folder even if the run failed part-way
+        cleanup_temp_dir()